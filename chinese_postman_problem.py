@@ -1,6 +1,31 @@
-from collections import defaultdict
-import heapq
-from functools import lru_cache
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+import os
+
+try:
+    import networkx as nx
+except ImportError:
+    nx = None
+
+try:
+    from gmpy2 import bit_scan1 as lowest_set_bit_index
+except ImportError:
+    def lowest_set_bit_index(bitmask):
+        return (bitmask & -bitmask).bit_length() - 1
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from scipy.sparse import csgraph
+except ImportError:
+    csgraph = None
+
+PARALLEL_BFS_MIN_SOURCES = 32
+UNREACHABLE_DISTANCE = 1 << 30
+MATCHING_INFINITY = 1 << 62
 
 graph_edges = [
     ("V1","V2","a1"), ("V2","V3","a2"), ("V3","V4","a3"), ("V4","V5","a4"),
@@ -18,114 +43,358 @@ def build_adjacency_list(edges_list):
     """
     Builds adjacency list from edges.
     
+    Vertices are numbered in order of first appearance, and each edge gets
+    a dense integer id (its position in edges_list), shared by both
+    directions of the undirected edge.
+    
     Args:
         edges_list: List of tuples (source, target, label)
     
     Returns:
-        defaultdict: Adjacency list where each vertex maps to list of neighbors
+        tuple: (adjacency_list, vertex_index) where adjacency_list[i] is the
+        list of (neighbor_index, edge_id) tuples of vertex i
     """
-    adjacency_list = defaultdict(list)
-    for source_vertex, target_vertex, edge_label in edges_list:
-        adjacency_list[source_vertex].append((target_vertex, 1, edge_label))
-        adjacency_list[target_vertex].append((source_vertex, 1, edge_label))
-    return adjacency_list
+    vertex_index = {}
+    adjacency_list = []
+    for edge_id, (source_vertex, target_vertex, _) in enumerate(edges_list):
+        for vertex in (source_vertex, target_vertex):
+            if vertex not in vertex_index:
+                vertex_index[vertex] = len(adjacency_list)
+                adjacency_list.append([])
+        source_index = vertex_index[source_vertex]
+        target_index = vertex_index[target_vertex]
+        adjacency_list[source_index].append((target_index, edge_id))
+        adjacency_list[target_index].append((source_index, edge_id))
+    return adjacency_list, vertex_index
 
-def dijkstra(adjacency_list, source_vertex):
+def build_csr(edges_list):
+    """
+    Builds a compressed sparse row (CSR) representation of the graph.
+    
+    Vertices are numbered in order of first appearance, matching the
+    vertex indices of build_adjacency_list.
+    
+    Args:
+        edges_list: List of tuples (source, target, label)
+    
+    Returns:
+        tuple: (indptr, indices, num_vertices, vertex_index) where the
+        neighbors of vertex i are indices[indptr[i]:indptr[i + 1]]
+    """
+    vertex_index = {}
+    for source_vertex, target_vertex, _ in edges_list:
+        vertex_index.setdefault(source_vertex, len(vertex_index))
+        vertex_index.setdefault(target_vertex, len(vertex_index))
+    num_vertices = len(vertex_index)
+    
+    indptr = array("i", [0]) * (num_vertices + 1)
+    for source_vertex, target_vertex, _ in edges_list:
+        indptr[vertex_index[source_vertex] + 1] += 1
+        indptr[vertex_index[target_vertex] + 1] += 1
+    for vertex in range(num_vertices):
+        indptr[vertex + 1] += indptr[vertex]
+    
+    indices = array("i", [0]) * indptr[num_vertices]
+    fill_position = indptr[:num_vertices]
+    for source_vertex, target_vertex, _ in edges_list:
+        source_index = vertex_index[source_vertex]
+        target_index = vertex_index[target_vertex]
+        indices[fill_position[source_index]] = target_index
+        fill_position[source_index] += 1
+        indices[fill_position[target_index]] = source_index
+        fill_position[target_index] += 1
+    
+    return indptr, indices, num_vertices, vertex_index
+
+def bfs_csr(indptr, indices, source_index, num_vertices):
     """
     Calculates shortest distances from a source vertex to all others.
     
+    Every edge has weight 1, so a breadth-first search gives the same
+    distances as Dijkstra in O(V + E) without a priority queue. Works
+    on integer vertex indices over the CSR arrays.
+    
     Args:
-        adjacency_list: Graph adjacency list
-        source_vertex: Source vertex
+        indptr: CSR row pointers
+        indices: CSR neighbor indices
+        source_index: Source vertex index
+        num_vertices: Number of vertices
     
     Returns:
-        tuple: (distances, predecessors)
+        tuple: (distances, predecessors) as int arrays indexed by vertex,
+        with UNREACHABLE_DISTANCE and -1 for vertices not reached
     """
-    distances = {vertex: float("inf") for vertex in adjacency_list}
-    predecessors = {vertex: None for vertex in adjacency_list}
-    distances[source_vertex] = 0
+    distances = array("i", [UNREACHABLE_DISTANCE]) * num_vertices
+    predecessors = array("i", [-1]) * num_vertices
+    distances[source_index] = 0
     
-    priority_queue = [(0, source_vertex)]
+    vertex_queue = deque([source_index])
     
-    while priority_queue:
-        current_distance, current_vertex = heapq.heappop(priority_queue)
+    while vertex_queue:
+        current_index = vertex_queue.popleft()
+        next_distance = distances[current_index] + 1
         
-        if current_distance != distances[current_vertex]:
-            continue
-            
-        for neighbor_vertex, edge_weight, _ in adjacency_list[current_vertex]:
-            new_distance = current_distance + edge_weight
-            if new_distance < distances[neighbor_vertex]:
-                distances[neighbor_vertex] = new_distance
-                predecessors[neighbor_vertex] = current_vertex
-                heapq.heappush(priority_queue, (new_distance, neighbor_vertex))
+        for neighbor_position in range(indptr[current_index], indptr[current_index + 1]):
+            neighbor_index = indices[neighbor_position]
+            if distances[neighbor_index] == UNREACHABLE_DISTANCE:
+                distances[neighbor_index] = next_distance
+                predecessors[neighbor_index] = current_index
+                vertex_queue.append(neighbor_index)
     
     return distances, predecessors
 
-def reconstruct_shortest_path(predecessors, start_vertex, end_vertex):
+def reconstruct_shortest_path(predecessors, vertex_names, start_index, end_index):
     """
     Reconstructs the shortest path between two vertices.
     
     Args:
-        predecessors: Dijkstra predecessors dictionary
-        start_vertex: Starting vertex
-        end_vertex: Ending vertex
+        predecessors: Predecessor index of each vertex, negative when absent
+        vertex_names: Vertex name of each index
+        start_index: Starting vertex index
+        end_index: Ending vertex index
     
     Returns:
         list: Path from start to end
     """
-    path = []
-    current_vertex = end_vertex
+    path = [end_index]
+    while path[-1] != start_index and predecessors[path[-1]] >= 0:
+        path.append(int(predecessors[path[-1]]))
     
-    while current_vertex is not None:
-        path.append(current_vertex)
-        if current_vertex == start_vertex:
-            break
-        current_vertex = predecessors[current_vertex]
-    
-    return list(reversed(path))
+    return [vertex_names[index] for index in reversed(path)]
 
-def hierholzer(adjacency_list, starting_vertex):
+def hierholzer(adjacency_list, vertex_index, starting_vertex):
     """
     Finds Eulerian circuit using Hierholzer's algorithm.
     
+    Works on integer vertex indices, so the stacks and per-vertex edge
+    cursors are int arrays; names are restored once on return.
+    
     Args:
-        adjacency_list: Graph adjacency list (must be Eulerian)
+        adjacency_list: Indexed graph adjacency list (must be Eulerian) with dense edge ids
+        vertex_index: Index of each vertex name
         starting_vertex: Starting vertex of the circuit
     
     Returns:
         list: Eulerian circuit
     """
-    vertex_stack = [starting_vertex]
-    eulerian_circuit = []
-    used_edges = set()
+    vertex_stack = array("i", [vertex_index[starting_vertex]])
+    eulerian_circuit = array("i")
+    num_edges = sum(len(neighbors) for neighbors in adjacency_list) // 2
+    used_edges = bytearray(num_edges)
     
-    next_edge_index = {vertex: 0 for vertex in adjacency_list}
+    next_edge_index = array("i", [0]) * len(adjacency_list)
     
     while vertex_stack:
         current_vertex = vertex_stack[-1]
         
-        while (next_edge_index[current_vertex] < len(adjacency_list[current_vertex]) and 
-               (current_vertex, 
-                adjacency_list[current_vertex][next_edge_index[current_vertex]][0], 
-                adjacency_list[current_vertex][next_edge_index[current_vertex]][2]) in used_edges):
-            next_edge_index[current_vertex] += 1
+        adjacent_edges = adjacency_list[current_vertex]
+        edge_index = next_edge_index[current_vertex]
+        end_index = len(adjacent_edges)
+        while edge_index < end_index and used_edges[adjacent_edges[edge_index][1]]:
+            edge_index += 1
         
-        if next_edge_index[current_vertex] == len(adjacency_list[current_vertex]):
+        if edge_index == end_index:
+            next_edge_index[current_vertex] = edge_index
             eulerian_circuit.append(current_vertex)
             vertex_stack.pop()
         else:
-            neighbor_vertex, _, edge_label = adjacency_list[current_vertex][next_edge_index[current_vertex]]
-            
-            if (current_vertex, neighbor_vertex, edge_label) in used_edges:
-                next_edge_index[current_vertex] += 1
-                continue
-            
-            used_edges.add((current_vertex, neighbor_vertex, edge_label))
-            used_edges.add((neighbor_vertex, current_vertex, edge_label))
+            neighbor_vertex, edge_id = adjacent_edges[edge_index]
+            used_edges[edge_id] = 1
+            next_edge_index[current_vertex] = edge_index + 1
             vertex_stack.append(neighbor_vertex)
     
-    return eulerian_circuit[::-1]
+    vertex_names = list(vertex_index)
+    return [vertex_names[vertex] for vertex in reversed(eulerian_circuit)]
+
+def find_minimum_matching(odd_distances_matrix):
+    """
+    Finds minimum cost perfect matching using DP with bitmask.
+    
+    Fills the DP table bottom-up over flat arrays indexed by bitmask: the
+    lowest available vertex is always paired, and choice[mask] records its
+    partner so the pairs are recovered once at the end. Only the set bits
+    of each mask are visited as candidate partners.
+    
+    Args:
+        odd_distances_matrix: Distance matrix between odd degree vertices
+    
+    Returns:
+        tuple: (minimum_cost, list_of_pairs)
+    """
+    num_odd_vertices = len(odd_distances_matrix)
+    num_masks = 1 << num_odd_vertices
+    
+    minimum_cost = array("q", [MATCHING_INFINITY]) * num_masks
+    choice = array("i", [-1]) * num_masks
+    minimum_cost[0] = 0
+    
+    for available_vertices_bitmask in range(1, num_masks):
+        if bin(available_vertices_bitmask).count("1") & 1:
+            continue
+        
+        first_available_index = lowest_set_bit_index(available_vertices_bitmask)
+        remaining_mask = available_vertices_bitmask ^ (1 << first_available_index)
+        distances_row = odd_distances_matrix[first_available_index]
+        best_cost = MATCHING_INFINITY
+        best_partner = -1
+        
+        pending_mask = remaining_mask
+        while pending_mask:
+            second_vertex_bit = pending_mask & -pending_mask
+            second_vertex_index = second_vertex_bit.bit_length() - 1
+            candidate_cost = (
+                minimum_cost[remaining_mask ^ second_vertex_bit]
+                + distances_row[second_vertex_index]
+            )
+            if candidate_cost < best_cost:
+                best_cost = candidate_cost
+                best_partner = second_vertex_index
+            pending_mask ^= second_vertex_bit
+        
+        minimum_cost[available_vertices_bitmask] = best_cost
+        choice[available_vertices_bitmask] = best_partner
+    
+    full_vertices_bitmask = num_masks - 1
+    matching_pairs = []
+    available_vertices_bitmask = full_vertices_bitmask
+    while available_vertices_bitmask:
+        first_available_index = lowest_set_bit_index(available_vertices_bitmask)
+        second_vertex_index = choice[available_vertices_bitmask]
+        matching_pairs.append((first_available_index, second_vertex_index))
+        available_vertices_bitmask ^= (1 << first_available_index) | (1 << second_vertex_index)
+    
+    return minimum_cost[full_vertices_bitmask], matching_pairs
+
+def blossom_minimum_matching(odd_distances_matrix):
+    """
+    Finds minimum cost perfect matching using Edmonds' blossom algorithm.
+    
+    Minimizes by maximizing negated weights on the complete graph of
+    odd vertices with maximum cardinality, which runs in O(k^3).
+    
+    Args:
+        odd_distances_matrix: Distance matrix between odd degree vertices
+    
+    Returns:
+        tuple: (minimum_cost, list_of_pairs)
+    """
+    num_odd_vertices = len(odd_distances_matrix)
+    complete_graph = nx.Graph()
+    for i in range(num_odd_vertices):
+        for j in range(i + 1, num_odd_vertices):
+            complete_graph.add_edge(i, j, weight=-odd_distances_matrix[i][j])
+    
+    matching = nx.max_weight_matching(complete_graph, maxcardinality=True)
+    matching_pairs = sorted((min(i, j), max(i, j)) for i, j in matching)
+    matching_cost = sum(odd_distances_matrix[i][j] for i, j in matching_pairs)
+    return matching_cost, matching_pairs
+
+def minimum_weight_matching(odd_distances_matrix):
+    """
+    Finds minimum cost perfect matching between odd degree vertices.
+    
+    Uses the blossom algorithm when networkx is installed and falls back
+    to the exact DP with bitmask otherwise.
+    
+    Args:
+        odd_distances_matrix: Distance matrix between odd degree vertices
+    
+    Returns:
+        tuple: (minimum_cost, list_of_pairs)
+    """
+    if nx is not None:
+        return blossom_minimum_matching(odd_distances_matrix)
+    return find_minimum_matching(odd_distances_matrix)
+
+def csgraph_shortest_paths(csr_graph, source_indices):
+    """
+    Calculates shortest paths from several sources at once with scipy.
+    
+    Runs a single multi-source Dijkstra in C over the CSR arrays.
+    
+    Args:
+        csr_graph: Tuple returned by build_csr
+        source_indices: Source vertex indices
+    
+    Returns:
+        tuple: (distances_matrix, predecessors_matrix) where row i holds
+        the results for source_indices[i]
+    """
+    indptr, indices, num_vertices, _ = csr_graph
+    graph_matrix = csr_matrix(
+        ([1] * len(indices), indices, indptr),
+        shape=(num_vertices, num_vertices)
+    )
+    return csgraph.dijkstra(
+        graph_matrix,
+        indices=source_indices,
+        return_predecessors=True,
+        unweighted=True
+    )
+
+def odd_vertices_shortest_paths(csr_graph, odd_degree_vertices):
+    """
+    Calculates shortest distances between every pair of odd vertices.
+    
+    Uses scipy's multi-source Dijkstra when available and falls back to
+    one breadth-first search per odd vertex otherwise. The fallback runs
+    are spread across processes once there are at least
+    PARALLEL_BFS_MIN_SOURCES odd vertices.
+    
+    Args:
+        csr_graph: Tuple returned by build_csr
+        odd_degree_vertices: Vertices with odd degree
+    
+    Returns:
+        tuple: (odd_distances_matrix, odd_vertices_path) where each row of
+        odd_distances_matrix is an int array and odd_vertices_path(i, j)
+        returns the shortest path between the i-th and j-th odd vertices
+    """
+    indptr, indices, num_vertices, vertex_index = csr_graph
+    vertex_names = list(vertex_index)
+    odd_indices = [vertex_index[vertex] for vertex in odd_degree_vertices]
+    num_odd_vertices = len(odd_indices)
+    
+    if csgraph is not None:
+        distances_matrix, predecessors_matrix = csgraph_shortest_paths(csr_graph, odd_indices)
+        odd_distances = distances_matrix[:, odd_indices]
+        odd_distances = np.where(np.isfinite(odd_distances), odd_distances, UNREACHABLE_DISTANCE)
+        odd_distances_matrix = [
+            array("i", distances_row) for distances_row in odd_distances.astype(int).tolist()
+        ]
+    else:
+        if num_odd_vertices >= PARALLEL_BFS_MIN_SOURCES:
+            num_workers = os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                shortest_paths_results = list(executor.map(
+                    partial(bfs_csr, indptr, indices),
+                    odd_indices,
+                    repeat(num_vertices),
+                    chunksize=-(-num_odd_vertices // num_workers)
+                ))
+        else:
+            shortest_paths_results = [
+                bfs_csr(indptr, indices, odd_index, num_vertices) for odd_index in odd_indices
+            ]
+        predecessors_matrix = [predecessors for _, predecessors in shortest_paths_results]
+        odd_distances_matrix = [
+            array("i", [distances[odd_index] for odd_index in odd_indices])
+            for distances, _ in shortest_paths_results
+        ]
+    
+    def odd_vertices_path(i, j):
+        return reconstruct_shortest_path(
+            predecessors_matrix[i],
+            vertex_names,
+            odd_indices[i],
+            odd_indices[j]
+        )
+    
+    return odd_distances_matrix, odd_vertices_path
+
+graph_edges_snapshot = tuple(graph_edges)
+graph_edges_adjacency_list = build_adjacency_list(graph_edges_snapshot)
+graph_edges_csr = build_csr(graph_edges_snapshot)
 
 def chinese_postman_problem(edges_list, starting_vertex="V1"):
     """
@@ -138,96 +407,43 @@ def chinese_postman_problem(edges_list, starting_vertex="V1"):
     Returns:
         dict: Result containing total cost and tour
     """
-    adjacency_list = build_adjacency_list(edges_list)
+    use_cached_graph = tuple(edges_list) == graph_edges_snapshot
+    if use_cached_graph:
+        adjacency_list, vertex_index = graph_edges_adjacency_list
+    else:
+        adjacency_list, vertex_index = build_adjacency_list(edges_list)
     
-    vertex_degrees = {vertex: len(adjacency_list[vertex]) for vertex in adjacency_list}
-    odd_degree_vertices = [vertex for vertex in adjacency_list if vertex_degrees[vertex] % 2 == 1]
+    odd_degree_vertices = [vertex for vertex, index in vertex_index.items() if len(adjacency_list[index]) & 1]
 
     if not odd_degree_vertices:
-        eulerian_tour = hierholzer(build_adjacency_list(edges_list), starting_vertex)
+        eulerian_tour = hierholzer(adjacency_list, vertex_index, starting_vertex)
         return {
             "total_cost": len(edges_list),
             "tour": eulerian_tour
         }
 
-    all_shortest_paths_data = {}
-    for odd_vertex in odd_degree_vertices:
-        distances, predecessors = dijkstra(adjacency_list, odd_vertex)
-        all_shortest_paths_data[odd_vertex] = (distances, predecessors)
-
-    num_odd_vertices = len(odd_degree_vertices)
-    
-    odd_distances_matrix = [[0] * num_odd_vertices for _ in range(num_odd_vertices)]
-    odd_paths_matrix = [[None] * num_odd_vertices for _ in range(num_odd_vertices)]
-    
-    for i, source_odd_vertex in enumerate(odd_degree_vertices):
-        for j, target_odd_vertex in enumerate(odd_degree_vertices):
-            if i == j:
-                continue
-            odd_distances_matrix[i][j] = all_shortest_paths_data[source_odd_vertex][0][target_odd_vertex]
-            odd_paths_matrix[i][j] = reconstruct_shortest_path(
-                all_shortest_paths_data[source_odd_vertex][1], 
-                source_odd_vertex, 
-                target_odd_vertex
-            )
+    csr_graph = graph_edges_csr if use_cached_graph else build_csr(edges_list)
+    odd_distances_matrix, odd_vertices_path = odd_vertices_shortest_paths(csr_graph, odd_degree_vertices)
 
-    @lru_cache(None)
-    def find_minimum_matching(available_vertices_bitmask):
-        """
-        Finds minimum cost matching using DP with bitmask.
-        
-        Args:
-            available_vertices_bitmask: Bitmask representing available vertices
-        
-        Returns:
-            tuple: (minimum_cost, list_of_pairs)
-        """
-        if available_vertices_bitmask == 0:
-            return (0, [])
-        
-        first_available_index = (available_vertices_bitmask & -available_vertices_bitmask).bit_length() - 1
-        best_cost = float("inf")
-        best_pairing = []
-        
-        remaining_mask = available_vertices_bitmask & ~(1 << first_available_index)
-        
-        for second_vertex_index in range(first_available_index + 1, num_odd_vertices):
-            if remaining_mask & (1 << second_vertex_index):
-                new_available_mask = remaining_mask & ~(1 << second_vertex_index)
-                
-                subproblem_cost, subproblem_pairs = find_minimum_matching(new_available_mask)
-                
-                pair_cost = odd_distances_matrix[first_available_index][second_vertex_index]
-                candidate_solution = (
-                    subproblem_cost + pair_cost, 
-                    subproblem_pairs + [(first_available_index, second_vertex_index)]
-                )
-                
-
-                if candidate_solution[0] < best_cost:
-                    best_cost = candidate_solution[0]
-                    best_pairing = candidate_solution[1]
-        
-        return (best_cost, best_pairing)
-    full_vertices_bitmask = (1 << num_odd_vertices) - 1
-    matching_cost, matching_pairs = find_minimum_matching(full_vertices_bitmask)
+    matching_cost, matching_pairs = minimum_weight_matching(odd_distances_matrix)
 
-    multigraph_adjacency = build_adjacency_list(edges_list)
-    duplicate_edge_counter = 100
+    multigraph_adjacency = [list(neighbors) for neighbors in adjacency_list]
+    duplicate_edge_id = sum(len(neighbors) for neighbors in adjacency_list) // 2
     
     def add_path_to_multigraph(vertex_path):
-        nonlocal duplicate_edge_counter
+        nonlocal duplicate_edge_id
         for current_vertex, next_vertex in zip(vertex_path, vertex_path[1:]):
-            duplicate_label = f"dup{duplicate_edge_counter}"
-            multigraph_adjacency[current_vertex].append((next_vertex, 1, duplicate_label))
-            multigraph_adjacency[next_vertex].append((current_vertex, 1, duplicate_label))
-            duplicate_edge_counter += 1
+            current_index = vertex_index[current_vertex]
+            next_index = vertex_index[next_vertex]
+            multigraph_adjacency[current_index].append((next_index, duplicate_edge_id))
+            multigraph_adjacency[next_index].append((current_index, duplicate_edge_id))
+            duplicate_edge_id += 1
 
     for (first_index, second_index) in matching_pairs:
-        path_between_paired_vertices = odd_paths_matrix[first_index][second_index]
+        path_between_paired_vertices = odd_vertices_path(first_index, second_index)
         add_path_to_multigraph(path_between_paired_vertices)
 
-    final_eulerian_tour = hierholzer(multigraph_adjacency, starting_vertex)
+    final_eulerian_tour = hierholzer(multigraph_adjacency, vertex_index, starting_vertex)
     total_tour_cost = len(edges_list) + matching_cost
     
     return {